@@ -5,29 +5,76 @@ Directly updates Google Sheets with scraped sign counts using Google Sheets API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import re
 import time
 import sys
 import argparse
-import csv
+import random
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 import os.path
-import pickle
 
-# If modifying these scopes, delete the file token.pickle.
+# If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+TOKEN_FILE = 'token.json'
+# Token file written by older versions; only read by --migrate-token
+LEGACY_TOKEN_FILE = 'token.pickle'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Shared HTTP session so every request to the same host reuses a pooled keep-alive connection
+SESSION = requests.Session()
+SESSION.headers.update(DEFAULT_HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+def migrate_pickle_token():
+    """Convert a token.pickle from older versions into token.json (only run this on a token you trust)"""
+    import pickle
+    
+    if not os.path.exists(LEGACY_TOKEN_FILE):
+        print(f"❌ No {LEGACY_TOKEN_FILE} found to migrate")
+        return False
+    
+    try:
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
+            creds = pickle.load(token)
+        with open(TOKEN_FILE, 'w') as token:
+            token.write(creds.to_json())
+    except Exception as e:
+        print(f"❌ Token migration failed: {e}")
+        return False
+    
+    print(f"✅ Migrated {LEGACY_TOKEN_FILE} to {TOKEN_FILE}")
+    print(f"💡 Commit {TOKEN_FILE}; {LEGACY_TOKEN_FILE} is no longer used and can be deleted")
+    return True
 
 def get_google_sheets_service():
     """Get authenticated Google Sheets service"""
+    # Google client libraries are slow to import, so only load them once they're needed
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+    
     creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
+    # The token file stores the user's access and refresh tokens as plain JSON
+    if os.path.exists(TOKEN_FILE):
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
     
     # If there are no (valid) credentials available, let the user log in.
     if not creds or not creds.valid:
@@ -54,35 +101,142 @@ def get_google_sheets_service():
                 print("\nAfter setting up credentials, run this script again.")
                 return None
             
+            # The OAuth flow waits for a browser login, which would hang unattended runs (e.g. GitHub Actions)
+            if not sys.stdin.isatty():
+                print(f"❌ No valid {TOKEN_FILE} found and no terminal available for authentication.")
+                if os.path.exists(LEGACY_TOKEN_FILE):
+                    print(f"Run this script locally with --migrate-token to convert {LEGACY_TOKEN_FILE}, then commit {TOKEN_FILE}.")
+                else:
+                    print(f"Run this script once locally to create {TOKEN_FILE}, then commit it.")
+                return None
+            
             # Start OAuth flow
+            from google_auth_oauthlib.flow import InstalledAppFlow
             print("🔐 Starting OAuth authentication...")
             flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
             creds = flow.run_local_server(port=0, open_browser=False)
             print("✅ Authentication successful!")
         
         # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+        with open(TOKEN_FILE, 'w') as token:
+            token.write(creds.to_json())
         print("💾 Credentials saved for future use")
     
     try:
-        service = build('sheets', 'v4', credentials=creds)
+        # One service (and its keep-alive HTTP connection) is shared by every Sheets call;
+        # skip the discovery-document cache lookup since the v4 document ships with the client
+        service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
         return service
     except Exception as e:
         print(f"❌ Error creating Google Sheets service: {e}")
         return None
 
-def scrape_with_selenium(url):
-    """Scrape signature count using Selenium"""
+# Columns the updater reads from and writes to
+TITLE_HEADER = 'Title_Eng'
+VOTE_FORM_HEADER = 'VoteForm - Eng'
+VOTE_TALLY_HEADER = 'VoteTally - Eng'
+LAST_UPDATED_HEADER = 'Last Updated - Eng'
+
+# Local cache of the CSV export (ETag + body), recently scraped sign counts and
+# each petition's ETag / Last-Modified validators
+SHEET_CACHE_FILE = '.sheet_cache.json'
+
+# Signature count in the page's embedded JSON (most accurate); matches both the top-level
+# "signatureCount" object and the one nested under "signatureState"
+JS_SIGNATURE_PATTERN = re.compile(r'"signatureCount"\s*:\s*\{\s*"(?:displayed|total)"\s*:\s*(\d+)')
+SIGNATURE_MARKER_PATTERN = re.compile(r'"signatureCount"\s*:\s*\{')
+JS_SIGNATURE_BYTES_PATTERN = re.compile(JS_SIGNATURE_PATTERN.pattern.encode())
+
+# Stop reading a petition page after this many bytes if the signature JSON hasn't shown up
+MAX_PAGE_BYTES = 256 * 1024
+SIGNATURE_MARKER = b'"signatureCount"'
+
+# Fallback patterns for counts rendered as page text
+TEXT_SIGNATURE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(\d{1,3}(?:,\d{3})*)\s*signatures?',
+    r'(\d{1,3}(?:,\d{3})*)\s*people\s*signed',
+    r'(\d{1,3}(?:,\d{3})*)\s*supporters',
+    r'data-signature-count="(\d+)"',
+    r'signature-count[^>]*>(\d+)',
+    r'petition-signatures[^>]*>(\d+)',
+)]
+
+# Page loaded once per browser so in-page fetch() calls run from a change.org origin
+CHANGE_ORG_HOME = 'https://www.change.org/'
+
+# Resources Chrome never needs to fetch to read the signature count
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif",
+    "*.woff", "*.woff2", "*.ttf", "*.css", "*.svg", "*.mp4",
+    "googletagmanager.com/*", "google-analytics.com/*", "doubleclick.net/*",
+]
+
+# Resolved ChromeDriver path, cached so webdriver-manager only resolves it once per process
+_chromedriver_path = None
+# Set once the ~/.wdm cache has been wiped (only when PFP_RESET_DRIVER_CACHE is set)
+_driver_cache_reset = False
+
+def _reset_driver_cache():
+    """Clear the webdriver-manager cache once per process if PFP_RESET_DRIVER_CACHE is set"""
+    global _driver_cache_reset
+    if _driver_cache_reset or not os.environ.get("PFP_RESET_DRIVER_CACHE"):
+        return
+    _driver_cache_reset = True
+    
+    import shutil
+    cache_dir = os.path.expanduser("~/.wdm")
+    if os.path.exists(cache_dir):
+        try:
+            shutil.rmtree(cache_dir)
+            print("🧹 Cleared old driver cache")
+        except:
+            pass
+
+def _resolve_chromedriver_path():
+    """Return the ChromeDriver path, preferring the system driver over webdriver-manager"""
+    global _chromedriver_path
+    if _chromedriver_path:
+        return _chromedriver_path
+    
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    # Try to use system ChromeDriver first (for GitHub Actions)
+    system_chromedriver = "/usr/local/bin/chromedriver"
+    print(f"Checking for system ChromeDriver at: {system_chromedriver}")
+    print(f"File exists: {os.path.exists(system_chromedriver)}")
+    if os.path.exists(system_chromedriver):
+        print(f"File is executable: {os.access(system_chromedriver, os.X_OK)}")
+    
+    if os.path.exists(system_chromedriver) and os.access(system_chromedriver, os.X_OK):
+        print(f"✅ Using system ChromeDriver at: {system_chromedriver}")
+        _chromedriver_path = system_chromedriver
+        return _chromedriver_path
+    
+    # Fallback to webdriver-manager
+    print("❌ System ChromeDriver not found or not executable, using webdriver-manager...")
+    _reset_driver_cache()
+    driver_path = ChromeDriverManager().install()
+    print(f"Using ChromeDriver at: {driver_path}")
+    
+    # Verify the driver is executable and not corrupted
+    if not os.access(driver_path, os.X_OK):
+        print(f"Making driver executable: {driver_path}")
+        os.chmod(driver_path, 0o755)
+    
+    # Check if the file is actually a ChromeDriver binary (not a text file)
+    if 'THIRD_PARTY_NOTICES' in driver_path or not driver_path.endswith('chromedriver'):
+        print(f"❌ ChromeDriver path looks corrupted: {driver_path}")
+        raise Exception("ChromeDriver path is corrupted")
+    
+    _chromedriver_path = driver_path
+    return _chromedriver_path
+
+def build_driver():
+    """Create a headless Chrome driver to be shared across all scrapes"""
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.chrome.service import Service
-        from webdriver_manager.chrome import ChromeDriverManager
-        import time
-        import re
-        import os
-        import shutil
     except ImportError:
         print("Selenium not installed. Please run: pip install selenium webdriver-manager")
         return None
@@ -98,235 +252,419 @@ def scrape_with_selenium(url):
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        # Return from driver.get on DOMContentLoaded instead of waiting for every asset
+        chrome_options.page_load_strategy = "eager"
+        # Skip images - only the inline signature JSON in the HTML is needed
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
         
-        # Clear any cached drivers and force fresh download
-        cache_dir = os.path.expanduser("~/.wdm")
-        if os.path.exists(cache_dir):
-            try:
-                shutil.rmtree(cache_dir)
-                print("🧹 Cleared old driver cache")
-            except:
-                pass
-        
-        # Try to use system ChromeDriver first (for GitHub Actions)
-        system_chromedriver = "/usr/local/bin/chromedriver"
-        print(f"Checking for system ChromeDriver at: {system_chromedriver}")
-        print(f"File exists: {os.path.exists(system_chromedriver)}")
-        if os.path.exists(system_chromedriver):
-            print(f"File is executable: {os.access(system_chromedriver, os.X_OK)}")
-        
-        if os.path.exists(system_chromedriver) and os.access(system_chromedriver, os.X_OK):
-            print(f"✅ Using system ChromeDriver at: {system_chromedriver}")
-            service = Service(system_chromedriver)
-        else:
-            # Fallback to webdriver-manager
-            print("❌ System ChromeDriver not found or not executable, using webdriver-manager...")
-            try:
-                driver_path = ChromeDriverManager().install()
-                print(f"Using ChromeDriver at: {driver_path}")
-                
-                # Verify the driver is executable and not corrupted
-                if not os.access(driver_path, os.X_OK):
-                    print(f"Making driver executable: {driver_path}")
-                    os.chmod(driver_path, 0o755)
-                
-                # Check if the file is actually a ChromeDriver binary (not a text file)
-                if 'THIRD_PARTY_NOTICES' in driver_path or not driver_path.endswith('chromedriver'):
-                    print(f"❌ ChromeDriver path looks corrupted: {driver_path}")
-                    raise Exception("ChromeDriver path is corrupted")
-                
-                service = Service(driver_path)
-            except Exception as e:
-                print(f"❌ ChromeDriver setup failed: {e}")
-                raise e
+        try:
+            service = Service(_resolve_chromedriver_path())
+        except Exception as e:
+            print(f"❌ ChromeDriver setup failed: {e}")
+            raise e
         
         driver = webdriver.Chrome(service=service, options=chrome_options)
         
+        # Block heavy assets and trackers so each page transfers only the HTML
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        
+        return driver
+    
+    except Exception as e:
+        print(f"❌ Error starting Selenium: {e}")
+        return None
+
+def extract_signature_count(page_source):
+    """Extract the signature count from a petition page's HTML"""
+    # Locate the JSON key with a plain substring scan and only run the regex on the bytes after it
+    idx = page_source.find('"signatureCount"')
+    while idx >= 0:
+        match = JS_SIGNATURE_PATTERN.match(page_source, idx, idx + 256)
+        if match:
+            signature_count = int(match.group(1))
+            print(f"Found signature count in JavaScript data: {signature_count:,}")
+            return signature_count
+        idx = page_source.find('"signatureCount"', idx + 1)
+    
+    # If no JavaScript data found, try text patterns
+    for pattern in TEXT_SIGNATURE_PATTERNS:
+        matches = pattern.findall(page_source)
+        if matches:
+            # Get the largest number that could be a signature count
+            valid_numbers = []
+            for match in matches:
+                num = int(match.replace(',', ''))
+                if 1 <= num <= 1000000:  # Reasonable range for signatures
+                    valid_numbers.append(num)
+            
+            if valid_numbers:
+                largest = max(valid_numbers)
+                print(f"Found signature count in page text: {largest:,}")
+                return largest
+    
+    print("No signature count found")
+    return None
+
+# One Chrome per worker thread - a driver isn't thread-safe, but each can be reused by its own thread
+_thread_local = threading.local()
+_drivers = []
+_drivers_lock = threading.Lock()
+# Set when Chrome can't be started, so other rows don't keep retrying
+_browser_unavailable = False
+
+def get_thread_driver():
+    """Return this worker thread's Chrome driver, starting it on first use"""
+    global _browser_unavailable
+    driver = getattr(_thread_local, 'driver', None)
+    if driver or _browser_unavailable:
+        return driver
+    
+    with _drivers_lock:
+        if _browser_unavailable:
+            return None
+        driver = build_driver()
+        if driver is None:
+            _browser_unavailable = True
+            return None
+        _drivers.append(driver)
+    
+    _thread_local.driver = driver
+    return driver
+
+def quit_drivers():
+    """Quit every Chrome driver started by the worker threads"""
+    with _drivers_lock:
+        for driver in _drivers:
+            try:
+                driver.quit()
+            except:
+                pass
+        _drivers.clear()
+
+def fetch_in_browser(driver, url):
+    """Fetch a page's HTML from inside Chrome, reusing its connections and cache (None on failure)"""
+    try:
+        # fetch() runs from the current page, so make sure a change.org page is loaded first
+        if 'change.org' not in urlparse(driver.current_url).netloc:
+            driver.get(CHANGE_ORG_HOME)
+        html = driver.execute_script(
+            "return fetch(arguments[0]).then(r => r.ok ? r.text() : '');", url
+        )
+        return html or None
+    except Exception as e:
+        print(f"⚠️  In-browser fetch failed: {e}")
+        return None
+
+def scrape_with_browser(driver, url, try_fetch=True):
+    """Scrape signature count using an existing Selenium driver (try_fetch=False skips the in-page fetch)"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    
+    try:
         print(f"Scraping: {url}")
+        # If plain HTTP couldn't get the page (blocked or errored), try a fetch() inside the
+        # already-open tab before paying for a full navigation. When it did get the page, the
+        # same raw HTML would come back, so go straight to rendering it
+        if try_fetch:
+            page_source = fetch_in_browser(driver, url)
+            if page_source:
+                sign_count = extract_signature_count(page_source)
+                if sign_count is not None:
+                    return sign_count
+        
+        print("Loading page in browser...")
         driver.get(url)
+        wait = WebDriverWait(driver, 10, poll_frequency=0.2)
         
         # Handle chng.it redirects
         if 'chng.it' in url:
             print("Following chng.it redirect...")
-            time.sleep(3)  # Wait for redirect
+            wait.until(EC.url_contains("change.org"))
             current_url = driver.current_url
             print(f"Redirected to: {current_url}")
         
-        # Wait for page to load
-        time.sleep(5)
-        
-        # Get page source and look for signature count in JavaScript data
-        page_source = driver.page_source
-        
-        # Try to extract from JavaScript data (most accurate)
-        js_signature_patterns = [
-            r'"signatureCount":\s*{\s*"displayed":\s*(\d+),',
-            r'"signatureCount":\s*{\s*"total":\s*(\d+),',
-            r'"signatureState":\s*{\s*"signatureCount":\s*{\s*"total":\s*(\d+),',
-            r'"signatureState":\s*{\s*"signatureCount":\s*{\s*"displayed":\s*(\d+),'
-        ]
-        
-        for pattern in js_signature_patterns:
-            matches = re.findall(pattern, page_source)
-            if matches:
-                signature_count = int(matches[0])
-                print(f"Found signature count in JavaScript data: {signature_count:,}")
-                driver.quit()
-                return signature_count
-        
-        # If no JavaScript data found, try text patterns
-        signature_patterns = [
-            r'(\d{1,3}(?:,\d{3})*)\s*signatures?',
-            r'(\d{1,3}(?:,\d{3})*)\s*people\s*signed',
-            r'(\d{1,3}(?:,\d{3})*)\s*supporters',
-            r'data-signature-count="(\d+)"',
-            r'signature-count[^>]*>(\d+)',
-            r'petition-signatures[^>]*>(\d+)'
-        ]
-        
-        for pattern in signature_patterns:
-            matches = re.findall(pattern, page_source, re.IGNORECASE)
-            if matches:
-                # Get the largest number that could be a signature count
-                valid_numbers = []
-                for match in matches:
-                    num = int(match.replace(',', ''))
-                    if 1 <= num <= 1000000:  # Reasonable range for signatures
-                        valid_numbers.append(num)
-                
-                if valid_numbers:
-                    largest = max(valid_numbers)
-                    print(f"Found signature count in page text: {largest:,}")
-                    driver.quit()
-                    return largest
+        # Wait until the signature data is in the page rather than sleeping a fixed time
+        try:
+            wait.until(lambda d: SIGNATURE_MARKER_PATTERN.search(d.page_source))
+        except TimeoutException:
+            print("⚠️  Timed out waiting for signature data, checking page text...")
         
-        print("No signature count found")
-        driver.quit()
-        return None
+        return extract_signature_count(driver.page_source)
         
     except Exception as e:
         print(f"❌ Error scraping with Selenium: {e}")
-        try:
-            driver.quit()
-        except:
-            pass
-        
-        # Fallback: try with requests if Selenium fails
-        print("🔄 Trying fallback method with requests...")
-        return scrape_with_requests_fallback(url)
+        return None
 
-def scrape_with_requests_fallback(url):
-    """Fallback scraping method using requests (for GitHub Actions)"""
+class SignatureScanner:
+    """Buffer a streamed petition page until its signature count (or MAX_PAGE_BYTES) has arrived"""
+    
+    def __init__(self):
+        self.buf = bytearray()
+        self.search_from = 0
+        self.truncated = False
+    
+    def feed(self, chunk):
+        """Add a chunk of the page; returns True once the rest of the page isn't needed"""
+        self.buf += chunk
+        # Only stop at a "signatureCount" marker that is actually followed by a count
+        marker = self.buf.find(SIGNATURE_MARKER, self.search_from)
+        while marker >= 0 and len(self.buf) >= marker + 256:
+            if JS_SIGNATURE_BYTES_PATTERN.match(self.buf, marker, marker + 256):
+                return True
+            self.search_from = marker + 1
+            marker = self.buf.find(SIGNATURE_MARKER, self.search_from)
+        if marker < 0:
+            self.search_from = max(self.search_from, len(self.buf) - len(SIGNATURE_MARKER) + 1)
+        if len(self.buf) > MAX_PAGE_BYTES:
+            self.truncated = True
+            return True
+        return False
+    
+    def signature_count(self):
+        """Extract the signature count from what was read"""
+        # Text patterns on a cut-off page could pick up the wrong number, so leave it to the browser
+        if self.truncated:
+            print(f"No signature data in the first {MAX_PAGE_BYTES:,} bytes")
+            return None
+        return extract_signature_count(self.buf.decode('utf-8', errors='replace'))
+
+def conditional_headers(petition_cache, url):
+    """Build If-None-Match / If-Modified-Since headers from a petition's cached validators"""
+    entry = (petition_cache or {}).get(url)
+    if not entry or entry.get('count') is None:
+        return {}
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def remember_petition(petition_cache, url, response_headers, sign_count):
+    """Cache a petition's ETag / Last-Modified together with its freshly parsed count"""
+    etag = response_headers.get('ETag')
+    last_modified = response_headers.get('Last-Modified')
+    if petition_cache is not None and sign_count is not None and (etag or last_modified):
+        petition_cache[url] = {'etag': etag, 'last_modified': last_modified, 'count': sign_count}
+
+def scrape_fast_http(url, petition_cache=None):
+    """Scrape signature count from the plain HTML using requests, returning (fetched, sign_count)"""
     try:
-        import re
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        print(f"Fallback scraping: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        # Handle chng.it redirects
-        if 'chng.it' in url and response.url != url:
-            print(f"Following redirect to: {response.url}")
-            response = requests.get(response.url, headers=headers, timeout=30)
+        print(f"HTTP scraping: {url}")
+        # requests follows chng.it redirects on its own
+        with SESSION.get(url, headers=conditional_headers(petition_cache, url), stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                sign_count = petition_cache[url]['count']
+                print(f"Petition unchanged, using cached count: {sign_count:,}")
+                return True, sign_count
+            
             response.raise_for_status()
+            if response.url != url:
+                print(f"Followed redirect to: {response.url}")
+            
+            # Stream the page and stop once the signature count has arrived
+            scanner = SignatureScanner()
+            for chunk in response.iter_content(16384):
+                if scanner.feed(chunk):
+                    break
         
-        page_content = response.text
-        
-        # Try to extract from JavaScript data (most accurate)
-        js_signature_patterns = [
-            r'"signatureCount":\s*{\s*"displayed":\s*(\d+),',
-            r'"signatureCount":\s*{\s*"total":\s*(\d+),',
-            r'"signatureState":\s*{\s*"signatureCount":\s*{\s*"total":\s*(\d+),',
-            r'"signatureState":\s*{\s*"signatureCount":\s*{\s*"displayed":\s*(\d+),'
-        ]
-        
-        for pattern in js_signature_patterns:
-            matches = re.findall(pattern, page_content)
-            if matches:
-                signature_count = int(matches[0])
-                print(f"Found signature count in JavaScript data: {signature_count:,}")
-                return signature_count
-        
-        # If no JavaScript data found, try text patterns
-        signature_patterns = [
-            r'(\d{1,3}(?:,\d{3})*)\s*signatures?',
-            r'(\d{1,3}(?:,\d{3})*)\s*people\s*signed',
-            r'(\d{1,3}(?:,\d{3})*)\s*supporters',
-            r'data-signature-count="(\d+)"',
-            r'signature-count[^>]*>(\d+)',
-            r'petition-signatures[^>]*>(\d+)'
-        ]
+        sign_count = scanner.signature_count()
+        remember_petition(petition_cache, url, response.headers, sign_count)
+        return True, sign_count
         
-        for pattern in signature_patterns:
-            matches = re.findall(pattern, page_content, re.IGNORECASE)
-            if matches:
-                # Get the largest number that could be a signature count
-                valid_numbers = []
-                for match in matches:
-                    num = int(match.replace(',', ''))
-                    if 1 <= num <= 1000000:  # Reasonable range for signatures
-                        valid_numbers.append(num)
+    except Exception as e:
+        print(f"❌ Error with HTTP scraping: {e}")
+        return False, None
+
+def pacing_delay(delay, elapsed):
+    """Return how long to wait after a request: whatever part of the delay it didn't use, plus a little jitter"""
+    return max(0, delay - elapsed) + random.uniform(0, delay * 0.25)
+
+def scrape_all_http2(urls, workers, delay, petition_cache=None):
+    """Scrape petitions over a shared HTTP/2 connection, returning (fetched, sign_count) per URL (None without httpx)"""
+    try:
+        import asyncio
+        import httpx
+    except ImportError:
+        print("httpx not installed, fetching petitions one by one. Please run: pip install 'httpx[http2]'")
+        return None
+    
+    # Connection-specific headers aren't allowed over HTTP/2
+    headers = {k: v for k, v in DEFAULT_HEADERS.items() if k != 'Connection'}
+    
+    async def fetch_all():
+        # Cap in-flight requests so Change.org isn't hit with the whole sheet at once
+        limit = asyncio.Semaphore(workers)
+        async with httpx.AsyncClient(http2=True, timeout=30, headers=headers, follow_redirects=True) as client:
+            async def fetch_one(url):
+                async with client.stream('GET', url, headers=conditional_headers(petition_cache, url)) as response:
+                    if response.status_code == 304:
+                        return True, petition_cache[url]['count']
+                    response.raise_for_status()
+                    
+                    # Stream the page and stop once the signature count has arrived
+                    scanner = SignatureScanner()
+                    async for chunk in response.aiter_bytes(16384):
+                        if scanner.feed(chunk):
+                            break
                 
-                if valid_numbers:
-                    largest = max(valid_numbers)
-                    print(f"Found signature count in page text: {largest:,}")
-                    return largest
-        
-        print("No signature count found with fallback method")
+                sign_count = scanner.signature_count()
+                remember_petition(petition_cache, url, response.headers, sign_count)
+                return True, sign_count
+            
+            async def fetch(url):
+                async with limit:
+                    t0 = time.monotonic()
+                    # Any failure only affects this row, which is then retried on the threaded path
+                    try:
+                        result = await fetch_one(url)
+                    except Exception as e:
+                        print(f"❌ Error fetching {url}: {e}")
+                        result = (False, None)
+                    
+                    # Hold the slot for the rest of the delay, so each slot is paced like a threaded worker
+                    await asyncio.sleep(pacing_delay(delay, time.monotonic() - t0))
+                    return result
+            
+            return await asyncio.gather(*(fetch(url) for url in urls))
+    
+    try:
+        return asyncio.run(fetch_all())
+    except ImportError:
+        # httpx is installed without the h2 extra
+        print("HTTP/2 support not installed, fetching petitions one by one. Please run: pip install 'httpx[http2]'")
         return None
+
+def scrape_petition(title, url, delay, fetched=False, petition_cache=None):
+    """Scrape one petition over HTTP, falling back to this thread's browser (fetched=True skips the HTTP step)"""
+    print(f"Scraping votes for: {title}")
+    print(f"URL: {url}")
+    t0 = time.monotonic()
+    
+    sign_count = None
+    if not fetched:
+        fetched, sign_count = scrape_fast_http(url, petition_cache)
+    if sign_count is None:
+        driver = get_thread_driver()
+        if driver:
+            print("🔄 Trying browser scraping with Selenium...")
+            sign_count = scrape_with_browser(driver, url, try_fetch=not fetched)
+    print(f"Found {sign_count} votes for: {title}")
+    
+    # Pace each worker so it sends at most about one request per delay
+    time.sleep(pacing_delay(delay, time.monotonic() - t0))
+    return sign_count
+
+def load_sheet_cache():
+    """Load the local sheet cache, or an empty one if it's missing or unreadable"""
+    try:
+        with open(SHEET_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sheet_cache(cache):
+    """Write the local sheet cache back to disk"""
+    try:
+        with open(SHEET_CACHE_FILE, 'w') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️  Could not save sheet cache: {e}")
+
+def get_cached_count(cache, title, url, max_age):
+    """Return (count, scraped_at) from the cache if the row's title is unchanged and the count is under max_age seconds old"""
+    entry = cache.get('counts', {}).get(url)
+    if not entry or entry.get('title') != title or entry.get('count') is None:
+        return None
+    if time.time() - entry.get('scraped_at', 0) >= max_age:
+        return None
+    return entry['count'], entry['scraped_at']
+
+def is_recently_updated(vote_tally, last_updated, max_age):
+    """Check whether a sheet row already has a sign count written less than max_age seconds ago"""
+    if not vote_tally.strip():
+        return False
+    try:
+        last_updated = datetime.fromisoformat(last_updated.strip())
+    except ValueError:
+        return False
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - last_updated).total_seconds() < max_age
+
+def find_column(headers, name):
+    """Return the index of a header (matched case-insensitively), or None if it's missing"""
+    lowered = [str(header).lower() for header in headers]
+    return lowered.index(name.lower()) if name.lower() in lowered else None
+
+def select_columns(headers, rows):
+    """Return (title, VoteForm URL, vote tally, last updated) tuples for the given sheet rows"""
+    # Look the columns up once; a missing column reads as '' for every row
+    indices = [
+        find_column(headers, name)
+        for name in (TITLE_HEADER, VOTE_FORM_HEADER, VOTE_TALLY_HEADER, LAST_UPDATED_HEADER)
+    ]
+    return [
+        tuple(str(row[i]) if i is not None and i < len(row) else '' for i in indices)
+        for row in rows
+    ]
+
+def fetch_sheet_data(service, spreadsheet_id):
+    """Fetch the sheet rows as unformatted values and keep only the needed columns"""
+    try:
+        # Unformatted values skip the server-side number formatting
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=['A:Z'],
+            valueRenderOption='UNFORMATTED_VALUE'
+        ).execute()
         
+        rows = result.get('valueRanges', [{}])[0].get('values', [])
+        if not rows:
+            return [], []
+        
+        headers = [str(header) for header in rows[0]]
+        return headers, select_columns(headers, rows[1:])
+    
     except Exception as e:
-        print(f"❌ Error with fallback scraping: {e}")
-        return None
+        print(f"Error fetching sheet data: {e}")
+        return None, []
 
-def fetch_csv_data(csv_url, service=None, spreadsheet_id=None):
-    """Fetch CSV data from Google Sheets"""
+def fetch_csv_data(csv_url, cache=None):
+    """Fetch the sheet's CSV export (pass cache to revalidate the export with its ETag)"""
     try:
-        # If we have the service and spreadsheet_id, use the API
-        if service and spreadsheet_id:
-            result = service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range='A:H'  # Get all columns
-            ).execute()
-            
-            values = result.get('values', [])
-            if not values:
-                return []
-            
-            # Convert to CSV format for processing
-            headers = values[0]
-            rows = []
-            for row in values[1:]:
-                # Pad row to match headers length
-                while len(row) < len(headers):
-                    row.append('')
-                rows.append(dict(zip(headers, row)))
-            
-            return rows
+        import csv
+        
+        cached = (cache or {}).get('csv')
+        request_headers = {}
+        if cached and cached.get('etag'):
+            request_headers['If-None-Match'] = cached['etag']
+        
+        response = SESSION.get(csv_url, headers=request_headers, timeout=30)
+        if response.status_code == 304 and cached:
+            print("📦 Sheet unchanged, using cached CSV")
+            text = cached['body']
         else:
-            # Fallback to CSV URL
-            response = requests.get(csv_url)
             response.raise_for_status()
-            
-            lines = response.text.strip().split('\n')
-            reader = csv.DictReader(lines)
-            return list(reader)
+            text = response.text
+            if cache is not None and response.headers.get('ETag'):
+                cache['csv'] = {'etag': response.headers['ETag'], 'body': text}
+        
+        rows = list(csv.reader(text.strip().splitlines()))
+        if not rows:
+            return []
+        
+        return select_columns(rows[0], rows[1:])
         
     except Exception as e:
         print(f"Error fetching CSV data: {e}")
         return []
 
-def update_google_sheets_directly(spreadsheet_id, sign_counts, service):
-    """Update Google Sheets directly using Google Sheets API"""
+def update_google_sheets_directly(spreadsheet_id, sign_counts, service, headers=None):
+    """Update Google Sheets with (title, count, scraped_at) rows (pass headers to skip re-reading row 1)"""
     print("Updating Google Sheets directly...")
     
     try:
@@ -347,58 +685,63 @@ def update_google_sheets_directly(spreadsheet_id, sign_counts, service):
                 return False
         
         # First, check if VoteTally column exists
-        result = service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range='A1:Z1'
-        ).execute()
-        
-        headers = result.get('values', [[]])[0]
-        vote_tally_col = None
-        
-        # Find VoteTally - Eng column or add it
-        for i, header in enumerate(headers):
-            if header.lower() == 'votetally - eng':
-                vote_tally_col = chr(65 + i)  # Convert to column letter
-                break
+        if headers is None:
+            result = service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range='A1:Z1'
+            ).execute()
+            headers = result.get('values', [[]])[0]
+        
+        # Find the VoteTally - Eng and Last Updated - Eng columns, adding any that are missing
+        columns = {}
+        new_headers = []
+        for name in (VOTE_TALLY_HEADER, LAST_UPDATED_HEADER):
+            index = find_column(headers, name)
+            if index is not None:
+                columns[name] = chr(65 + index)  # Convert to column letter
+            else:
+                columns[name] = chr(65 + len(headers) + len(new_headers))  # Next free column
+                new_headers.append(name)
         
-        if not vote_tally_col:
-            # Add VoteTally - Eng column
-            print("📝 Adding VoteTally - Eng column...")
-            vote_tally_col = chr(65 + len(headers))  # Next column after existing headers
-            
-            # Add header
+        if new_headers:
+            print(f"📝 Adding {', '.join(new_headers)} column(s)...")
             service.spreadsheets().values().update(
                 spreadsheetId=spreadsheet_id,
-                range=f'{vote_tally_col}1',
+                range=f'{columns[new_headers[0]]}1',
                 valueInputOption='RAW',
-                body={'values': [['VoteTally - Eng']]}
+                body={'values': [new_headers]}
             ).execute()
         
+        vote_tally_col = columns[VOTE_TALLY_HEADER]
+        last_updated_col = columns[LAST_UPDATED_HEADER]
+        
         # Update sign counts
         print(f"Updating sign counts in column {vote_tally_col}...")
         
-        updates = []
-        for i, (title, count) in enumerate(sign_counts):
-            if count is not None:
-                row_num = i + 2  # +2 because we start from row 2 (after header)
-                updates.append({
-                    'range': f'{vote_tally_col}{row_num}',
-                    'values': [[str(count)]]
-                })
+        # Write each column as one range; None cells are skipped by the API so
+        # rows without a fresh count keep their existing value and timestamp.
+        # The timestamp is when the count was scraped, which may predate this run for cached counts
+        last_row = len(sign_counts) + 1
+        tally_values = [[str(count) if count is not None else None] for _, count, _ in sign_counts]
+        updated_values = [
+            [datetime.fromtimestamp(scraped_at, timezone.utc).isoformat(timespec='seconds') if count is not None else None]
+            for _, count, scraped_at in sign_counts
+        ]
+        updated = sum(1 for _, count, _ in sign_counts if count is not None)
         
-        if updates:
-            # Batch update
-            batch_body = {
-                'valueInputOption': 'RAW',
-                'data': updates
-            }
-            
+        if updated:
             service.spreadsheets().values().batchUpdate(
                 spreadsheetId=spreadsheet_id,
-                body=batch_body
+                body={
+                    'valueInputOption': 'RAW',
+                    'data': [
+                        {'range': f'{vote_tally_col}2:{vote_tally_col}{last_row}', 'values': tally_values},
+                        {'range': f'{last_updated_col}2:{last_updated_col}{last_row}', 'values': updated_values},
+                    ]
+                }
             ).execute()
             
-            print(f"Successfully updated {len(updates)} sign counts!")
+            print(f"Successfully updated {updated} sign counts!")
             return True
         else:
             print("⚠️  No sign counts to update")
@@ -446,10 +789,22 @@ def main():
     parser.add_argument('--csv-url', default='https://docs.google.com/spreadsheets/d/12I3l5W2CBLvuyMpSnau9NiHBMpmIeptQTcP6vUjY-ls/edit?usp=sharing',
                        help='Google Sheets URL')
     parser.add_argument('--delay', type=float, default=2.0,
-                       help='Delay between requests in seconds')
+                       help='Delay between requests in seconds (per worker)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Number of petitions to scrape in parallel (max 8)')
+    parser.add_argument('--min-refresh-age', type=float, default=6.0,
+                       help='Only re-scrape petitions whose count is older than this many hours')
+    parser.add_argument('--force-refresh', action='store_true',
+                       help='Scrape every petition, even if its count was updated recently')
+    parser.add_argument('--migrate-token', action='store_true',
+                       help='Convert an existing token.pickle into token.json and exit')
     
     args = parser.parse_args()
     
+    if args.migrate_token:
+        migrate_pickle_token()
+        return
+    
     print("Fully Automated Google Sheets Updater")
     print("=" * 45)
     
@@ -471,10 +826,15 @@ def main():
         spreadsheet_id = args.csv_url.split('/d/')[1].split('/')[0]
         print(f"Using direct spreadsheet ID: {spreadsheet_id}")
     
+    cache = load_sheet_cache()
+    
     print("Fetching current data from Google Sheets...")
-    # Use CSV export method for better compatibility
-    csv_export_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
-    csv_data = fetch_csv_data(csv_export_url, None, None)
+    # Headers and rows come back together from one API call
+    headers, csv_data = fetch_sheet_data(service, spreadsheet_id)
+    if headers is None:
+        # Fall back to the CSV export if the API read failed
+        csv_export_url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv"
+        csv_data = fetch_csv_data(csv_export_url, cache)
     
     if not csv_data:
         print("❌ No CSV data found")
@@ -482,28 +842,80 @@ def main():
     
     print(f"Found {len(csv_data)} rows")
     
-    # Scrape sign counts
+    # Collect the Change.org rows to scrape, skipping ones refreshed recently
+    max_age = 0 if args.force_refresh else args.min_refresh_age * 60 * 60
     sign_counts = []
-    for row in csv_data:
-        title = row.get('Title_Eng', 'Unknown')
-        vote_form_url = row.get('VoteForm - Eng', '').strip()
+    jobs = []
+    for title, vote_form_url, vote_tally, last_updated in csv_data:
+        title = title or 'Unknown'
+        vote_form_url = vote_form_url.strip()
+        sign_counts.append((title, None, None))
         
         if vote_form_url and is_change_org_url(vote_form_url):
-            print(f"Scraping votes for: {title}")
-            print(f"URL: {vote_form_url}")
-            sign_count = scrape_with_selenium(vote_form_url)
-            print(f"Found {sign_count} votes")
-            sign_counts.append((title, sign_count))
-            time.sleep(args.delay)
-        else:
-            sign_counts.append((title, None))
-            if vote_form_url:
-                print(f"Skipping non-Change.org URL: {vote_form_url}")
+            cached = get_cached_count(cache, title, vote_form_url, max_age)
+            if is_recently_updated(vote_tally, last_updated, max_age):
+                print(f"Skipping recently updated row: {title}")
+            elif cached is not None:
+                cached_count, scraped_at = cached
+                print(f"Using cached count for: {title} ({cached_count:,})")
+                sign_counts[-1] = (title, cached_count, scraped_at)
             else:
-                print("No VoteForm - Eng URL found for row")
+                jobs.append((len(sign_counts) - 1, title, vote_form_url))
+        elif vote_form_url:
+            print(f"Skipping non-Change.org URL: {vote_form_url}")
+        else:
+            print("No VoteForm - Eng URL found for row")
+    
+    def record_count(idx, title, url, sign_count):
+        # Results are written back by row index so the sheet order is kept
+        scraped_at = time.time()
+        sign_counts[idx] = (title, sign_count, scraped_at)
+        if sign_count is not None:
+            cache.setdefault('counts', {})[url] = {
+                'title': title,
+                'count': sign_count,
+                'scraped_at': scraped_at,
+            }
+    
+    workers = max(1, min(args.workers, 8))
+    petition_cache = cache.setdefault('petitions', {})
+    try:
+        # Fetch every petition page up front over one multiplexed HTTP/2 connection
+        retries = [(idx, title, url, False) for idx, title, url in jobs]
+        if jobs:
+            print(f"Fetching {len(jobs)} petitions over HTTP/2...")
+            results = scrape_all_http2([url for _, _, url in jobs], workers, args.delay, petition_cache)
+            if results is not None:
+                retries = []
+                for (idx, title, url), (fetched, sign_count) in zip(jobs, results):
+                    if sign_count is None:
+                        # Retry failed fetches over HTTP; pages without a count go straight to the browser
+                        retries.append((idx, title, url, fetched))
+                    else:
+                        print(f"Found {sign_count} votes for: {title}")
+                        record_count(idx, title, url, sign_count)
+        
+        # Scrape whatever is left in parallel
+        if retries:
+            print(f"Scraping {len(retries)} petitions with {workers} workers...")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(scrape_petition, title, url, args.delay, fetched, petition_cache): (idx, title, url)
+                    for idx, title, url, fetched in retries
+                }
+                for future in as_completed(futures):
+                    idx, title, url = futures[future]
+                    try:
+                        record_count(idx, title, url, future.result())
+                    except Exception as e:
+                        print(f"❌ Error scraping {title}: {e}")
+    finally:
+        quit_drivers()
+        SESSION.close()
+        save_sheet_cache(cache)
     
     # Update Google Sheets
-    success = update_google_sheets_directly(spreadsheet_id, sign_counts, service)
+    success = update_google_sheets_directly(spreadsheet_id, sign_counts, service, headers)
     
     if success:
         print("\nSuccessfully updated Google Sheets!")